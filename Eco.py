@@ -1,153 +1,664 @@
 import sqlite3
 import re
-from typing import Dict, Optional
+import atexit
+import datetime
+import io
+import itertools
+import logging
+import operator
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
 
 DB_NAME = "ECO.db"
 
+logger = logging.getLogger(__name__)
+
+_CPF_RE = re.compile(r"[0-9]{11}").fullmatch
+
+# Datas são gravadas como INTEGER: dias desde 1970-01-01
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+_CONN: Optional[sqlite3.Connection] = None
+
+# Versão do esquema gravada em PRAGMA user_version
+_SCHEMA_VERSION = 1
+
+# Conexões somente leitura: com WAL, várias leituras rodam em paralelo à escrita
+_READ_POOL_SIZE = 4
+_READ_POOL: Optional["queue.Queue[sqlite3.Connection]"] = None
+_READ_POOL_LOCK = threading.Lock()
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+# A conexão de escrita é compartilhada entre threads: bulk_tx() serializa as
+# transações e registra a thread dona, a única que lê pela conexão de escrita
+_TX_LOCK = threading.Lock()
+_TX_OWNER: Optional[int] = None
+# Mensagens de sucesso das operações feitas dentro de bulk_tx(), emitidas
+# só depois do COMMIT da transação externa
+_SUCESSOS_PENDENTES: List[Tuple[str, tuple]] = []
+
+# Cache da saída de listar_pessoas, invalidado a cada escrita. A chave junta
+# o contador de escritas deste processo com PRAGMA data_version, que muda
+# quando outra conexão faz commit no banco.
+_VERSION = 0
+_CACHE: Tuple[Tuple[int, int], str] = ((-1, -1), "")
+
+
+def get_conn() -> sqlite3.Connection:
+    """Retorna a conexão compartilhada, abrindo-a na primeira chamada."""
+    global _CONN
+    if _CONN is None:
+        _CONN = sqlite3.connect(DB_NAME, isolation_level=None, check_same_thread=False,
+                                cached_statements=256)
+        _CONN.executescript("""
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA cache_size=-64000;
+        PRAGMA mmap_size=268435456;
+        PRAGMA foreign_keys=ON;
+        """)
+        atexit.register(_CONN.close)
+    return _CONN
+
+
+def _invalidar_listagem() -> None:
+    global _VERSION
+    _VERSION += 1
+
+
+def _fechar_read_pool() -> None:
+    while _READ_POOL is not None and not _READ_POOL.empty():
+        _READ_POOL.get_nowait().close()
+
+
+def _get_read_pool() -> "queue.Queue[sqlite3.Connection]":
+    global _READ_POOL
+    with _READ_POOL_LOCK:
+        if _READ_POOL is None:
+            get_conn()  # garante o arquivo do banco já em modo WAL
+            pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+            for _ in range(_READ_POOL_SIZE):
+                conn = sqlite3.connect(f"file:{DB_NAME}?mode=ro", uri=True,
+                                       check_same_thread=False, cached_statements=256)
+                conn.executescript("""
+                PRAGMA temp_store=MEMORY;
+                PRAGMA cache_size=-64000;
+                PRAGMA mmap_size=268435456;
+                """)
+                pool.put(conn)
+            _READ_POOL = pool
+            atexit.register(_fechar_read_pool)
+    return _READ_POOL
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Thread usada por listar_pessoas para a consulta paralela, criada uma única vez."""
+    global _EXECUTOR
+    with _READ_POOL_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=1)
+    return _EXECUTOR
+
+
+def _em_transacao_propria() -> bool:
+    """Indica se a thread atual está dentro de um bulk_tx()."""
+    return _TX_OWNER == threading.get_ident()
+
+
+@contextmanager
+def read_conn() -> Iterator[sqlite3.Connection]:
+    """Empresta uma conexão somente leitura do pool, devolvendo-a ao sair.
+
+    Se a thread atual estiver dentro de um bulk_tx(), usa a conexão principal,
+    para que a leitura enxergue as próprias escritas ainda não confirmadas.
+    As demais threads sempre leem do pool e só veem dados confirmados.
+    """
+    if _em_transacao_propria():
+        yield get_conn()
+        return
+
+    pool = _get_read_pool()
+    conn = pool.get()
+    try:
+        yield conn
+    finally:
+        pool.put(conn)
+
+
+@contextmanager
+def bulk_tx() -> Iterator[sqlite3.Connection]:
+    """Agrupa as operações do bloco em uma única transação (um único fsync).
+
+    Abre a transação com BEGIN IMMEDIATE e faz COMMIT ao sair, ou ROLLBACK
+    se o bloco levantar uma exceção, que é repassada. Dentro de outra
+    transação usa um SAVEPOINT, então inserções e remoções individuais feitas
+    dentro de um bloco bulk_tx() não fazem commit a cada linha. Falhas no
+    ROLLBACK são apenas registradas, para não esconder a exceção original.
+    Outras threads esperam a transação terminar antes de abrir a sua.
+    As mensagens de _log_sucesso() do bloco só são emitidas após o COMMIT.
+    """
+    global _TX_OWNER
+    conn = get_conn()
+    if _em_transacao_propria():
+        conn.execute("SAVEPOINT bulk_tx")
+        pendentes = len(_SUCESSOS_PENDENTES)
+        try:
+            yield conn
+        except BaseException:
+            _desfazer(conn, "ROLLBACK TO bulk_tx", "RELEASE bulk_tx")
+            del _SUCESSOS_PENDENTES[pendentes:]
+            raise
+        conn.execute("RELEASE bulk_tx")
+        return
+
+    with _TX_LOCK:
+        conn.execute("BEGIN IMMEDIATE")
+        _TX_OWNER = threading.get_ident()
+        try:
+            try:
+                yield conn
+            except BaseException:
+                _desfazer(conn, "ROLLBACK")
+                raise
+            try:
+                conn.execute("COMMIT")
+            except BaseException:
+                _desfazer(conn, "ROLLBACK")
+                raise
+            for msg, args in _SUCESSOS_PENDENTES:
+                logger.info(msg, *args)
+        finally:
+            _TX_OWNER = None
+            _SUCESSOS_PENDENTES.clear()
+            _invalidar_listagem()
+
+
+def _log_sucesso(msg: str, *args) -> None:
+    """Registra uma mensagem de sucesso; dentro de bulk_tx() espera o COMMIT."""
+    if _em_transacao_propria():
+        _SUCESSOS_PENDENTES.append((msg, args))
+    else:
+        logger.info(msg, *args)
+
+
+def _desfazer(conn: sqlite3.Connection, *comandos: str) -> None:
+    """Desfaz a transação sem esconder a exceção que está sendo tratada."""
+    if not conn.in_transaction:
+        logger.warning("Transação já encerrada antes do ROLLBACK")
+        return
+    try:
+        for sql in comandos:
+            conn.execute(sql)
+    except sqlite3.Error as e:
+        logger.warning("Falha ao desfazer a transação: %s", e)
+
 
 def criar_tabelas():
     try:
-        conn = sqlite3.connect(DB_NAME)
+        conn = get_conn()
         cursor = conn.cursor()
         
-        # Tabela Titulares
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS Titulares (
-            CPF TEXT PRIMARY KEY,
-            Credencial TEXT UNIQUE NOT NULL,
-            Nome TEXT NOT NULL,
-            Sexo TEXT CHECK(Sexo IN ('M', 'F')),
-            DtNascimento TEXT NOT NULL,
-            Idade INTEGER,
-            FaixaANS TEXT,
-            EstadoCivil TEXT,
-            TipoSuplementar TEXT,
-            CEP TEXT,
-            Bairro TEXT,
-            Cidade TEXT,
-            Estado TEXT,
-            StatusSegurado TEXT DEFAULT 'Ativo',
-            DataInicio TEXT,
-            DataFim TEXT
-        )
-        """)
+        # Esquema já criado/migrado: nada a fazer
+        if cursor.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
+            return
         
-        # Tabela Dependentes
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS Dependentes (
-            CPF TEXT PRIMARY KEY,
-            Credencial TEXT UNIQUE NOT NULL,
-            Nome TEXT NOT NULL,
-            Sexo TEXT CHECK(Sexo IN ('M', 'F')),
-            DtNascimento TEXT NOT NULL,
-            Idade INTEGER,
-            FaixaANS TEXT,
-            EstadoCivil TEXT,
-            GrauParentesco TEXT NOT NULL,
-            TipoSuplementar TEXT,
-            CPFTitular TEXT NOT NULL,
-            StatusSegurado TEXT DEFAULT 'Ativo',
-            DataInicio TEXT,
-            DataFim TEXT,
-            FOREIGN KEY (CPFTitular) REFERENCES Titulares(CPF) ON DELETE CASCADE
-        )
-        """)
+        with bulk_tx():
+            legado = _esquema_legado(cursor)
+            if legado:
+                _renomear_tabelas_legado(cursor)
+            
+            # Tabela Titulares
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS Titulares (
+                CPF INTEGER PRIMARY KEY,
+                Credencial TEXT UNIQUE NOT NULL,
+                Nome TEXT NOT NULL,
+                Sexo TEXT CHECK(Sexo IN ('M', 'F')),
+                DtNascimento INTEGER NOT NULL,
+                Idade INTEGER,
+                FaixaANS TEXT,
+                EstadoCivil TEXT,
+                TipoSuplementar TEXT,
+                CEP TEXT,
+                Bairro TEXT,
+                Cidade TEXT,
+                Estado TEXT,
+                StatusSegurado TEXT DEFAULT 'Ativo',
+                DataInicio INTEGER,
+                DataFim INTEGER
+            )
+            """)
+        
+            # Tabela Dependentes
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS Dependentes (
+                CPF INTEGER PRIMARY KEY,
+                Credencial TEXT UNIQUE NOT NULL,
+                Nome TEXT NOT NULL,
+                Sexo TEXT CHECK(Sexo IN ('M', 'F')),
+                DtNascimento INTEGER NOT NULL,
+                Idade INTEGER,
+                FaixaANS TEXT,
+                EstadoCivil TEXT,
+                GrauParentesco TEXT NOT NULL,
+                TipoSuplementar TEXT,
+                CPFTitular INTEGER NOT NULL,
+                TitularNome TEXT,
+                StatusSegurado TEXT DEFAULT 'Ativo',
+                DataInicio INTEGER,
+                DataFim INTEGER,
+                FOREIGN KEY (CPFTitular) REFERENCES Titulares(CPF) ON DELETE CASCADE
+            )
+            """)
+
+            if legado:
+                _copiar_tabelas_legado(cursor)
+            
+            # Mantém Dependentes.TitularNome igual ao Nome do titular, para que
+            # listar_pessoas não precise de JOIN. Na inserção o valor já vem
+            # do próprio INSERT (_DEPENDENTE_VALORES).
+            cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_dep_titular_nome_update
+            AFTER UPDATE OF CPFTitular ON Dependentes
+            BEGIN
+                UPDATE Dependentes
+                SET TitularNome = (SELECT Nome FROM Titulares WHERE CPF = NEW.CPFTitular)
+                WHERE CPF = NEW.CPF;
+            END
+            """)
+            cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_tit_nome_update
+            AFTER UPDATE OF Nome ON Titulares
+            BEGIN
+                UPDATE Dependentes SET TitularNome = NEW.Nome WHERE CPFTitular = NEW.CPF;
+            END
+            """)
         
-        conn.commit()
-        print("Tabelas criadas com sucesso!")
+            # Índices para o CASCADE/gatilho por CPFTitular e para o ORDER BY Nome
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_dep_cpf_titular ON Dependentes(CPFTitular)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_tit_nome ON Titulares(Nome)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_dep_nome ON Dependentes(Nome)")
+
+            # Bancos criados antes de user_version podem ter o antigo gatilho
+            # de inserção, que regravava TitularNome a cada linha
+            cursor.execute("DROP TRIGGER IF EXISTS trg_dep_titular_nome_insert")
+
+            cursor.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        
+        logger.info("Tabelas criadas com sucesso!")
     except sqlite3.Error as e:
-        print(f"Erro ao criar tabelas: {e}")
-    finally:
-        conn.close()
+        logger.error("Erro ao criar tabelas: %s", e)
+
+
+def _esquema_legado(cursor: sqlite3.Cursor) -> bool:
+    """Indica se o banco ainda tem o esquema original, com CPFs e datas em TEXT."""
+    tipos = {row[1]: row[2] for row in cursor.execute("PRAGMA table_info(Titulares)")}
+    return tipos.get("CPF") == "TEXT"
+
+
+def _renomear_tabelas_legado(cursor: sqlite3.Cursor) -> None:
+    """Tira as tabelas antigas do caminho para que as novas sejam criadas."""
+    for gatilho in ("trg_dep_titular_nome_update", "trg_tit_nome_update"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {gatilho}")
+    for indice in ("idx_dep_cpf_titular", "idx_tit_nome", "idx_dep_nome"):
+        cursor.execute(f"DROP INDEX IF EXISTS {indice}")
+    cursor.execute("ALTER TABLE Dependentes RENAME TO Dependentes_legado")
+    cursor.execute("ALTER TABLE Titulares RENAME TO Titulares_legado")
+
+
+# Datas antigas fora do formato 'AAAA-MM-DD' viram NULL em julianday() e não
+# passam no NOT NULL: essas linhas são descartadas, com aviso, na migração
+_SQL_DATAS_LEGADO_INVALIDAS = """
+    julianday({0}DtNascimento) IS NULL
+    OR (COALESCE({0}DataInicio, '') <> '' AND julianday({0}DataInicio) IS NULL)
+    OR (COALESCE({0}DataFim, '') <> '' AND julianday({0}DataFim) IS NULL)
+"""
+
+
+def _copiar_tabelas_legado(cursor: sqlite3.Cursor) -> None:
+    """Copia os dados antigos convertendo CPFs e datas 'AAAA-MM-DD' para inteiros."""
+    invalidas = _SQL_DATAS_LEGADO_INVALIDAS.format("")
+    _avisar_descartados(cursor, "titular(es) com data inválida",
+                        f"SELECT CPF FROM Titulares_legado WHERE {invalidas}")
+    # julianday(...) - 2440587.5 = dias desde 1970-01-01
+    cursor.execute(f"""
+    INSERT INTO Titulares (
+        CPF, Credencial, Nome, Sexo, Idade, FaixaANS, EstadoCivil, TipoSuplementar,
+        CEP, Bairro, Cidade, Estado, StatusSegurado, DtNascimento, DataInicio, DataFim
+    )
+    SELECT CAST(CPF AS INTEGER), Credencial, Nome, Sexo, Idade, FaixaANS, EstadoCivil,
+           TipoSuplementar, CEP, Bairro, Cidade, Estado, StatusSegurado,
+           CAST(julianday(DtNascimento) - 2440587.5 AS INTEGER),
+           CAST(julianday(DataInicio) - 2440587.5 AS INTEGER),
+           CAST(julianday(DataFim) - 2440587.5 AS INTEGER)
+    FROM Titulares_legado
+    WHERE NOT ({invalidas})
+    """)
+    invalidas = _SQL_DATAS_LEGADO_INVALIDAS.format("d.")
+    _avisar_descartados(cursor, "dependente(s) com data inválida",
+                        f"SELECT d.CPF FROM Dependentes_legado d WHERE {invalidas}")
+    # Sem foreign_keys, o esquema antigo deixava dependentes órfãos ao remover
+    # um titular. Eles não passam na FK nova e são descartados, com aviso.
+    _avisar_descartados(cursor, "dependente(s) sem titular", f"""
+    SELECT d.CPF FROM Dependentes_legado d
+    WHERE NOT ({invalidas})
+      AND NOT EXISTS (SELECT 1 FROM Titulares t WHERE t.CPF = CAST(d.CPFTitular AS INTEGER))
+    """)
+    cursor.execute(f"""
+    INSERT INTO Dependentes (
+        CPF, CPFTitular, TitularNome, Credencial, Nome, Sexo, Idade, FaixaANS, EstadoCivil,
+        GrauParentesco, TipoSuplementar, StatusSegurado, DtNascimento, DataInicio, DataFim
+    )
+    SELECT CAST(d.CPF AS INTEGER), CAST(d.CPFTitular AS INTEGER), t.Nome, d.Credencial,
+           d.Nome, d.Sexo, d.Idade, d.FaixaANS, d.EstadoCivil, d.GrauParentesco,
+           d.TipoSuplementar, d.StatusSegurado,
+           CAST(julianday(d.DtNascimento) - 2440587.5 AS INTEGER),
+           CAST(julianday(d.DataInicio) - 2440587.5 AS INTEGER),
+           CAST(julianday(d.DataFim) - 2440587.5 AS INTEGER)
+    FROM Dependentes_legado d
+    JOIN Titulares t ON t.CPF = CAST(d.CPFTitular AS INTEGER)
+    WHERE NOT ({invalidas})
+    """)
+    cursor.execute("DROP TABLE Dependentes_legado")
+    cursor.execute("DROP TABLE Titulares_legado")
+
+
+def _avisar_descartados(cursor: sqlite3.Cursor, motivo: str, sql: str) -> None:
+    """Registra os CPFs das linhas antigas que a migração vai descartar."""
+    cpfs = [row[0] for row in cursor.execute(sql)]
+    if cpfs:
+        logger.warning("%d %s descartado(s) na migração: %s",
+                       len(cpfs), motivo, ", ".join(map(str, cpfs)))
+
+
+
+
+def cpf_valido(cpf: str) -> Optional[int]:
+    """Retorna o CPF como inteiro (formato gravado no banco) ou None se inválido."""
+    return int(cpf) if _CPF_RE(cpf) is not None else None
+
+
+def _parse_date(valor) -> Optional[int]:
+    """Converte 'AAAA-MM-DD' (ou datetime.date) em dias desde 1970-01-01."""
+    if valor is None:
+        return None
+    if isinstance(valor, datetime.datetime):
+        valor = valor.date()
+    elif not isinstance(valor, datetime.date):
+        valor = datetime.date.fromisoformat(valor)
+    return valor.toordinal() - _EPOCH_ORDINAL
+
+
+def cpf_valido_fast(cpf: str) -> Optional[int]:
+    """Versão sem regex de cpf_valido, usada nas inserções em lote."""
+    return int(cpf) if len(cpf) == 11 and cpf.isascii() and cpf.isdigit() else None
+
+
+
+_MULTI_VALUES_MIN_ROWS = 10
+_SQLITE_MAX_VARIABLES = 999
+
+_TITULAR_COLS = (
+    'CPF', 'Credencial', 'Nome', 'Sexo', 'Idade', 'FaixaANS', 'EstadoCivil', 'TipoSuplementar',
+    'CEP', 'Bairro', 'Cidade', 'Estado', 'StatusSegurado', 'DtNascimento', 'DataInicio', 'DataFim'
+)
+
+_DEPENDENTE_COLS = (
+    'CPF', 'CPFTitular', 'TitularNome', 'Credencial', 'Nome', 'Sexo', 'Idade', 'FaixaANS',
+    'EstadoCivil', 'GrauParentesco', 'TipoSuplementar', 'StatusSegurado', 'DtNascimento',
+    'DataInicio', 'DataFim'
+)
+
+# TitularNome é lido de Titulares no próprio INSERT, a partir do CPF do titular
+_SQL_NOME_TITULAR = "(SELECT Nome FROM Titulares WHERE CPF = ?)"
+
+_DEPENDENTE_VALORES = tuple(
+    _SQL_NOME_TITULAR if col == 'TitularNome' else "?" for col in _DEPENDENTE_COLS
+)
+
+# Chaves dos dicionários de entrada, na mesma ordem das colunas acima. Os CPFs
+# (primeiras colunas, com o do titular repetido para TitularNome) e as datas
+# (últimas colunas) ficam de fora: entram já convertidos para inteiro.
+_TITULAR_KEYS = (
+    'credencial', 'nome', 'sexo', 'idade', 'faixa_ans', 'estado_civil',
+    'tipo_suplementar', 'cep', 'bairro', 'cidade', 'estado', 'status'
+)
+
+_DEPENDENTE_KEYS = (
+    'credencial', 'nome', 'sexo', 'idade', 'faixa_ans', 'estado_civil',
+    'grau_parentesco', 'tipo_suplementar', 'status'
+)
+
+_DATE_KEYS = ('dt_nascimento', 'data_inicio', 'data_fim')
+
+_titular_params = operator.itemgetter(*_TITULAR_KEYS)
+_dependente_params = operator.itemgetter(*_DEPENDENTE_KEYS)
+_date_params = operator.itemgetter(*_DATE_KEYS)
+
+_SQL_INSERT_TITULAR = """
+        INSERT INTO Titulares (
+            CPF, Credencial, Nome, Sexo, Idade, FaixaANS, EstadoCivil, TipoSuplementar,
+            CEP, Bairro, Cidade, Estado, StatusSegurado, DtNascimento, DataInicio, DataFim
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
 
+_SQL_INSERT_DEPENDENTE = (
+    f"INSERT INTO Dependentes ({', '.join(_DEPENDENTE_COLS)}) "
+    f"VALUES ({', '.join(_DEPENDENTE_VALORES)})"
+)
 
+_SQL_EXISTE_TITULAR = "SELECT 1 FROM Titulares WHERE CPF = ?"
 
+_SQL_DELETE_TITULAR = "DELETE FROM Titulares WHERE CPF = ?"
 
-def cpf_valido(cpf: str) -> bool:
-    
-    return bool(re.fullmatch(r"\d{11}", cpf))
+_SQL_DELETE_DEPENDENTE = "DELETE FROM Dependentes WHERE CPF = ?"
 
+_SQL_DELETE_TITULAR_RETURNING = "DELETE FROM Titulares WHERE CPF = ? RETURNING 1"
 
+_SQL_DELETE_DEPENDENTE_RETURNING = "DELETE FROM Dependentes WHERE CPF = ? RETURNING 1"
 
-def inserir_titular(dados: Dict[str, str]) -> None:
-  
-    if not cpf_valido(dados['cpf']):
-        print(f"CPF inválido: {dados['cpf']}")
+# DELETE ... RETURNING existe a partir do SQLite 3.35
+_SUPORTA_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+_SQL_LISTAR_TITULARES = """
+        SELECT CPF, Nome, Sexo, Idade, Estado, StatusSegurado 
+        FROM Titulares
+        ORDER BY Nome
+        """
+
+_SQL_LISTAR_DEPENDENTES = """
+        SELECT CPF, Nome, Sexo, Idade, GrauParentesco, TitularNome, StatusSegurado 
+        FROM Dependentes
+        ORDER BY Nome
+        """
+
+# CPFs são gravados como inteiros: {:0>11} restaura os zeros à esquerda
+_FMT_TITULAR = "CPF: {:0>11} | Nome: {} | Sexo: {} | Idade: {} | Estado: {} | Status: {}\n".format
+
+_FMT_DEPENDENTE = (
+    "CPF: {:0>11} | Nome: {} | Sexo: {} | Idade: {} | Parentesco: {} | Titular: {} | Status: {}\n"
+).format
+
+
+def _multi_values_insert(cursor: sqlite3.Cursor, table: str, cols: Tuple[str, ...],
+                         rows: List[tuple], chunk: int = 50,
+                         valores: Optional[Tuple[str, ...]] = None) -> None:
+    """Insere as linhas com INSERT ... VALUES (...), (...), ... em blocos.
+
+    `valores` permite trocar o "?" de cada coluna por uma expressão com
+    exatamente um parâmetro.
+    """
+    chunk = min(chunk, _SQLITE_MAX_VARIABLES // len(cols))
+    placeholder = "(" + ",".join(valores or "?" * len(cols)) + ")"
+    prefix = f"INSERT INTO {table} ({', '.join(cols)}) VALUES "
+    full_sql = prefix + ",".join([placeholder] * chunk)
+    for i in range(0, len(rows), chunk):
+        bloco = rows[i:i + chunk]
+        sql = full_sql if len(bloco) == chunk else prefix + ",".join([placeholder] * len(bloco))
+        cursor.execute(sql, list(itertools.chain.from_iterable(bloco)))
+
+
+def inserir_titulares_bulk(rows: List[Dict[str, str]]) -> None:
+    """Insere vários titulares em uma única transação."""
+    params = []
+    for dados in rows:
+        cpf = cpf_valido_fast(dados['cpf'])
+        if cpf is None:
+            logger.warning("CPF inválido: %s", dados['cpf'])
+            continue
+        try:
+            datas = tuple(map(_parse_date, _date_params(dados)))
+        except (TypeError, ValueError) as e:
+            logger.warning("Data inválida para o CPF %s: %s", dados['cpf'], e)
+            continue
+        if datas[0] is None:
+            logger.warning("Data de nascimento ausente para o CPF %s", dados['cpf'])
+            continue
+        params.append((cpf,) + _titular_params(dados) + datas)
+    _gravar_titulares(params)
+
+
+def _gravar_titulares(params: List[tuple]) -> None:
+    """Grava as tuplas de parâmetros já validadas em uma única transação."""
+    if not params:
         return
-    
+
+    inicio = time.perf_counter()
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-        INSERT INTO Titulares (
-            CPF, Credencial, Nome, Sexo, DtNascimento, Idade, FaixaANS, EstadoCivil,
-            TipoSuplementar, CEP, Bairro, Cidade, Estado, StatusSegurado, DataInicio, DataFim
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            dados['cpf'], dados['credencial'], dados['nome'], dados['sexo'],
-            dados['dt_nascimento'], dados['idade'], dados['faixa_ans'],
-            dados['estado_civil'], dados['tipo_suplementar'], dados['cep'],
-            dados['bairro'], dados['cidade'], dados['estado'], dados['status'],
-            dados['data_inicio'], dados['data_fim']
-        ))
-        
-        conn.commit()
-        print(f"Titular '{dados['nome']}' inserido com sucesso!")
+        with bulk_tx() as conn:
+            cursor = conn.cursor()
+            if len(params) > _MULTI_VALUES_MIN_ROWS:
+                _multi_values_insert(cursor, "Titulares", _TITULAR_COLS, params)
+            else:
+                cursor.executemany(_SQL_INSERT_TITULAR, params)
+        if len(params) == 1:
+            _log_sucesso("Titular '%s' inserido com sucesso!", params[0][2])
+        else:
+            _log_sucesso("%d titulares inseridos em %.2fs", len(params), time.perf_counter() - inicio)
     except sqlite3.IntegrityError as e:
-        print(f"Erro de integridade: {e}")
+        logger.error("Erro de integridade: %s", e)
     except sqlite3.Error as e:
-        print(f"Erro no banco de dados: {e}")
-    finally:
-        conn.close()
+        logger.error("Erro no banco de dados: %s", e)
 
 
+def inserir_titular(dados: Dict[str, str]) -> None:
+    inserir_titulares_bulk([dados])
 
-def inserir_dependente(dados: Dict[str, str]) -> None:
-  
-    if not cpf_valido(dados['cpf']):
-        print(f"CPF inválido do dependente: {dados['cpf']}")
-        return
-        
-    if not cpf_valido(dados['cpf_titular']):
-        print(f"CPF inválido do titular: {dados['cpf_titular']}")
-        return
 
-    try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
+_CSV_COLUNAS_OBRIGATORIAS = ('cpf', 'credencial', 'nome', 'dt_nascimento')
 
 
+def inserir_titulares_csv(path: str) -> None:
+    """Importa titulares de um CSV (colunas com os nomes das chaves de inserir_titular).
 
-     
-        cursor.execute("SELECT 1 FROM Titulares WHERE CPF = ?", (dados['cpf_titular'],))
-        if not cursor.fetchone():
-            print(f"Erro: Titular com CPF {dados['cpf_titular']} não encontrado.")
-            return
-        
+    A validação dos CPFs e o cálculo da idade são feitos de forma vetorizada
+    com pandas, que é importado apenas quando esta função é usada.
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        logger.error("Erro: a importação de CSV requer o pacote pandas.")
+        return
+
+    try:
+        df = pd.read_csv(path, dtype=str)
+    except (OSError, ValueError) as e:
+        logger.error("Erro ao ler o arquivo %s: %s", path, e)
+        return
 
+    # Demais colunas são opcionais e ficam NULL; a idade é calculada
+    faltando = [col for col in _CSV_COLUNAS_OBRIGATORIAS if col not in df.columns]
+    if faltando:
+        logger.error("Erro: colunas ausentes no arquivo %s: %s", path, ", ".join(faltando))
+        return
 
-      
-        cursor.execute("""
-        INSERT INTO Dependentes (
-            CPF, Credencial, Nome, Sexo, DtNascimento, Idade, FaixaANS, EstadoCivil,
-            GrauParentesco, TipoSuplementar, CPFTitular, StatusSegurado, DataInicio, DataFim
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            dados['cpf'], dados['credencial'], dados['nome'], dados['sexo'],
-            dados['dt_nascimento'], dados['idade'], dados['faixa_ans'],
-            dados['estado_civil'], dados['grau_parentesco'], dados['tipo_suplementar'],
-            dados['cpf_titular'], dados['status'], dados['data_inicio'], dados['data_fim']
-        ))
-        
-        conn.commit()
-        print(f"Dependente '{dados['nome']}' inserido com sucesso!")
+    mask = df['cpf'].str.fullmatch(r'[0-9]{11}', na=False)
+    for cpf in df.loc[~mask, 'cpf']:
+        logger.warning("CPF inválido: %s", cpf)
+    df = df[mask]
+
+    datas = df.reindex(columns=list(_DATE_KEYS)).apply(
+        pd.to_datetime, format='%Y-%m-%d', errors='coerce')
+    invalidas = (datas.isna() & df.reindex(columns=list(_DATE_KEYS)).notna()).any(axis=1)
+    for cpf in df.loc[invalidas, 'cpf']:
+        logger.warning("Data inválida para o CPF %s", cpf)
+    df, datas = df[~invalidas], datas[~invalidas]
+
+    sem_nascimento = datas['dt_nascimento'].isna()
+    for cpf in df.loc[sem_nascimento, 'cpf']:
+        logger.warning("Data de nascimento ausente para o CPF %s", cpf)
+    df, datas = df[~sem_nascimento], datas[~sem_nascimento]
+
+    epoch = pd.Timestamp(1970, 1, 1)
+    df = df.assign(
+        cpf=df['cpf'].astype('int64'),
+        idade=((pd.Timestamp.today() - datas['dt_nascimento']).dt.days // 365).astype('Int64'),
+        **{k: (datas[k] - epoch).dt.days.astype('Int64') for k in _DATE_KEYS},
+    )
+    df = df.reindex(columns=['cpf', *_TITULAR_KEYS, *_DATE_KEYS]).astype(object)
+    df = df.where(df.notna(), None)
+
+    _gravar_titulares(list(df.itertuples(index=False, name=None)))
+
+
+def inserir_dependentes_bulk(rows: List[Dict[str, str]]) -> None:
+    """Insere vários dependentes em uma única transação."""
+    params = []
+    for dados in rows:
+        cpf = cpf_valido_fast(dados['cpf'])
+        if cpf is None:
+            logger.warning("CPF inválido do dependente: %s", dados['cpf'])
+            continue
+        cpf_titular = cpf_valido_fast(dados['cpf_titular'])
+        if cpf_titular is None:
+            logger.warning("CPF inválido do titular: %s", dados['cpf_titular'])
+            continue
+        try:
+            datas = tuple(map(_parse_date, _date_params(dados)))
+        except (TypeError, ValueError) as e:
+            logger.warning("Data inválida para o CPF %s: %s", dados['cpf'], e)
+            continue
+        if datas[0] is None:
+            logger.warning("Data de nascimento ausente para o CPF %s", dados['cpf'])
+            continue
+        params.append((cpf, cpf_titular, cpf_titular) + _dependente_params(dados) + datas)
+    if not params:
+        return
+
+    inicio = time.perf_counter()
+    try:
+        with bulk_tx() as conn:
+            cursor = conn.cursor()
+            if len(params) > _MULTI_VALUES_MIN_ROWS:
+                _multi_values_insert(cursor, "Dependentes", _DEPENDENTE_COLS, params,
+                                     valores=_DEPENDENTE_VALORES)
+            else:
+                cursor.executemany(_SQL_INSERT_DEPENDENTE, params)
+        if len(params) == 1:
+            _log_sucesso("Dependente '%s' inserido com sucesso!", params[0][4])
+        else:
+            _log_sucesso("%d dependentes inseridos em %.2fs", len(params), time.perf_counter() - inicio)
     except sqlite3.IntegrityError as e:
-        print(f"Erro de integridade: {e}")
+        # A existência do titular é garantida pela FOREIGN KEY (PRAGMA foreign_keys=ON)
+        if "FOREIGN KEY" not in str(e):
+            logger.error("Erro de integridade: %s", e)
+        elif len(params) == 1:
+            logger.error("Erro: Titular com CPF %011d não encontrado.", params[0][1])
+        else:
+            logger.error("Erro: Titular não encontrado para um ou mais dependentes.")
     except sqlite3.Error as e:
-        print(f"Erro no banco de dados: {e}")
-    finally:
-        conn.close()
+        logger.error("Erro no banco de dados: %s", e)
+
+
+def inserir_dependente(dados: Dict[str, str]) -> None:
+    inserir_dependentes_bulk([dados])
 
 
 
@@ -157,68 +668,85 @@ def inserir_dependente(dados: Dict[str, str]) -> None:
 
 def remover_pessoa(cpf: str) -> None:
     """Remove uma pessoa (titular ou dependente)"""
-    if not cpf_valido(cpf):
-        print(f"CPF inválido: {cpf}")
+    cpf_num = cpf_valido(cpf)
+    if cpf_num is None:
+        logger.warning("CPF inválido: %s", cpf)
         return
     
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        
-      
-        cursor.execute("SELECT 1 FROM Titulares WHERE CPF = ?", (cpf,))
-        if cursor.fetchone():
-            cursor.execute("DELETE FROM Titulares WHERE CPF = ?", (cpf,))
-            print(f"Titular com CPF {cpf} e seus dependentes foram removidos com sucesso!")
-        else:
-           
-            cursor.execute("DELETE FROM Dependentes WHERE CPF = ?", (cpf,))
-            if cursor.rowcount > 0:
-                print(f"Dependente com CPF {cpf} removido com sucesso!")
+        # Mesma transação do chamador quando dentro de bulk_tx()
+        with bulk_tx() as conn:
+            cursor = conn.cursor()
+            if _SUPORTA_RETURNING:
+                if cursor.execute(_SQL_DELETE_TITULAR_RETURNING, (cpf_num,)).fetchall():
+                    _log_sucesso("Titular com CPF %s e seus dependentes foram removidos com sucesso!", cpf)
+                elif cursor.execute(_SQL_DELETE_DEPENDENTE_RETURNING, (cpf_num,)).fetchall():
+                    _log_sucesso("Dependente com CPF %s removido com sucesso!", cpf)
+                else:
+                    logger.warning("Nenhuma pessoa encontrada com CPF %s", cpf)
             else:
-                print(f"Nenhuma pessoa encontrada com CPF {cpf}")
-        
-        conn.commit()
+                cursor.execute(_SQL_EXISTE_TITULAR, (cpf_num,))
+                if cursor.fetchone():
+                    cursor.execute(_SQL_DELETE_TITULAR, (cpf_num,))
+                    _log_sucesso("Titular com CPF %s e seus dependentes foram removidos com sucesso!", cpf)
+                else:
+                    cursor.execute(_SQL_DELETE_DEPENDENTE, (cpf_num,))
+                    if cursor.rowcount > 0:
+                        _log_sucesso("Dependente com CPF %s removido com sucesso!", cpf)
+                    else:
+                        logger.warning("Nenhuma pessoa encontrada com CPF %s", cpf)
     except sqlite3.Error as e:
-        print(f"Erro ao remover pessoa: {e}")
-    finally:
-        conn.close()
+        logger.error("Erro ao remover pessoa: %s", e)
+
+def _listar_dependentes() -> List[str]:
+    with read_conn() as conn:
+        return list(itertools.starmap(_FMT_DEPENDENTE, conn.execute(_SQL_LISTAR_DEPENDENTES)))
+
 
 def listar_pessoas() -> None:
+    """Lista titulares e dependentes, reaproveitando a última saída se não houve escrita."""
+    global _CACHE
+    conn = get_conn()
+    versao = (_VERSION, conn.execute("PRAGMA data_version").fetchone()[0])
+    # Dentro de uma transação desta thread a listagem inclui escritas que ainda
+    # podem ser desfeitas, então não usa nem alimenta o cache
+    em_transacao = _em_transacao_propria()
+    if not em_transacao and _CACHE[0] == versao:
+        sys.stdout.write(_CACHE[1])
+        return
     
+    saida = io.StringIO()
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
+        # A consulta de dependentes roda em outra conexão enquanto os
+        # titulares são listados. Dentro de uma transação as duas usam a
+        # conexão principal, então rodam em sequência.
+        dependentes = None if em_transacao else _get_executor().submit(_listar_dependentes)
         
-        print("\n=== Titulares ===")
-        cursor.execute("""
-        SELECT CPF, Nome, Sexo, Idade, Estado, StatusSegurado 
-        FROM Titulares
-        ORDER BY Nome
-        """)
-        
-        for row in cursor.fetchall():
-            print(f"CPF: {row[0]} | Nome: {row[1]} | Sexo: {row[2]} | Idade: {row[3]} | Estado: {row[4]} | Status: {row[5]}")
+        with read_conn() as conn:
+            saida.write("\n=== Titulares ===\n")
+            cursor = conn.execute(_SQL_LISTAR_TITULARES)
+            saida.writelines(itertools.starmap(_FMT_TITULAR, cursor))
         
-        print("\n=== Dependentes ===")
-        cursor.execute("""
-        SELECT d.CPF, d.Nome, d.Sexo, d.Idade, d.GrauParentesco, t.Nome as Titular, d.StatusSegurado 
-        FROM Dependentes d
-        JOIN Titulares t ON d.CPFTitular = t.CPF
-        ORDER BY d.Nome
-        """)
+        saida.write("\n=== Dependentes ===\n")
+        saida.writelines(_listar_dependentes() if dependentes is None else dependentes.result())
         
-        for row in cursor.fetchall():
-            print(f"CPF: {row[0]} | Nome: {row[1]} | Sexo: {row[2]} | Idade: {row[3]} | Parentesco: {row[4]} | Titular: {row[5]} | Status: {row[6]}")
-            
     except sqlite3.Error as e:
-        print(f"Erro ao listar pessoas: {e}")
-    finally:
-        conn.close()
+        logger.error("Erro ao listar pessoas: %s", e)
+        return
+    
+    texto = saida.getvalue()
+    if not em_transacao:
+        _CACHE = (versao, texto)
+    sys.stdout.write(texto)
 
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.WARNING if "--quiet" in sys.argv[1:] else logging.INFO,
+        format="%(message)s",
+        stream=sys.stdout,
+    )
     criar_tabelas()
 
 